@@ -1,32 +1,91 @@
-import argparse
 import sys
+import functools
 import logging
 import os
-import json
-import subprocess
+import shutil
 
 logger = logging.getLogger(__name__)
 
 
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler that writes through a large buffer instead of flushing per record"""
+
+    buffer_size = 65536
+    # Records at or above this level are written out immediately
+    flush_level = logging.WARNING
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        super().emit(record)
+        # Warnings and errors show up in the log right away and are not
+        # lost if the process dies in native code
+        if record.levelno >= self.flush_level:
+            super().flush()
+
+    def flush(self):
+        # Lower-level records are written out when the buffer fills up and
+        # when the handler is closed by logging.shutdown()
+        pass
+
+
+def _systemd_unit_path(unit: str) -> str:
+    """Build a unit's systemd D-Bus object path (sd_bus_path_encode escaping)"""
+    escaped = ''.join(
+        c if c.isascii() and c.isalnum() and (i or not c.isdigit())
+        else '_%02x' % ord(c)
+        for i, c in enumerate(unit)
+    )
+    return f'/org/freedesktop/systemd1/unit/{escaped}'
+
+
+def get_unit_active_state(unit: str):
+    """Query the user systemd manager over D-Bus for a unit's ActiveState"""
+    from gi.repository import Gio, GLib
+
+    # systemd resolves unit object paths on demand, so a single
+    # Properties.Get is enough; units that are not loaded report 'inactive'
+    bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+    state, = bus.call_sync(
+        'org.freedesktop.systemd1',
+        _systemd_unit_path(unit),
+        'org.freedesktop.DBus.Properties',
+        'Get',
+        GLib.Variant('(ss)', ('org.freedesktop.systemd1.Unit', 'ActiveState')),
+        GLib.VariantType('(v)'),
+        Gio.DBusCallFlags.NONE,
+        -1,
+        None
+    ).unpack()
+    return state
+
+
 def check_dependencies():
     """Check if required system dependencies are installed"""
     # Check for ydotool
-    try:
-        subprocess.run(['which', 'ydotool'], check=True, capture_output=True)
-    except subprocess.CalledProcessError:
+    if shutil.which('ydotool') is None:
         print("Error: 'ydotool' command not found. Please install it.")
         print("On Ubuntu/Debian: sudo apt install ydotool")
         print("On Arch: sudo pacman -S ydotool")
         return False
 
+    # A ydotoold that accepts a connection is up, however it was started;
+    # a socket file left behind by a crashed daemon refuses it, so only
+    # then ask systemd
+    import socket
+    from src.pycomplete.core.ydotool import get_socket_path
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        try:
+            sock.connect(get_socket_path())
+            return True
+        except OSError:
+            pass
+
     # Check if ydotool service is running
     try:
-        result = subprocess.run(
-            ['systemctl', '--user', 'is-active', 'ydotool.service'],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode != 0:
+        if get_unit_active_state('ydotool.service') != 'active':
             print("Error: ydotool service is not running.")
             print("Start it with: systemctl --user start ydotool.service")
             print("To enable on startup: systemctl --user enable ydotool.service")
@@ -38,16 +97,28 @@ def check_dependencies():
     return True
 
 
-def get_config_path():
-    """Get the path to the config file, creating default if needed"""
+@functools.cache
+def _config_dir():
+    """Resolve the config directory, creating it if needed"""
     # Use XDG config directory if available
     config_dir = os.getenv('XDG_CONFIG_HOME', os.path.expanduser('~/.config'))
     config_dir = os.path.join(config_dir, 'pycomplete')
-
-    # Create config directory if it doesn't exist
     os.makedirs(config_dir, exist_ok=True)
+    return config_dir
+
 
-    config_path = os.path.join(config_dir, 'text_field_config.json')
+@functools.cache
+def _log_dir():
+    """Resolve the log directory, creating it if needed"""
+    log_dir = os.path.expanduser('~/.local/share/pycomplete/logs')
+    os.makedirs(log_dir, exist_ok=True)
+    return log_dir
+
+
+@functools.cache
+def get_config_path():
+    """Get the path to the config file, creating default if needed"""
+    config_path = os.path.join(_config_dir(), 'text_field_config.json')
 
     # Create default config if it doesn't exist
     if not os.path.exists(config_path):
@@ -57,8 +128,8 @@ def get_config_path():
                 'key_code': 65289
             }
         }
-        with open(config_path, 'w') as f:
-            json.dump(default_config, f, indent=2)
+        from src.pycomplete.core.config import _write_json
+        _write_json(config_path, default_config)
 
     return config_path
 
@@ -72,19 +143,32 @@ def setup_logging(debug_level: int):
     }
     log_level = log_levels.get(debug_level, logging.DEBUG)
 
-    # Create logs directory if it doesn't exist
-    log_dir = os.path.expanduser('~/.local/share/pycomplete/logs')
-    os.makedirs(log_dir, exist_ok=True)
-
-    # Configure logging
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(os.path.join(log_dir, 'pycomplete.log')),
-            logging.StreamHandler()
-        ]
-    )
+    log_dir = _log_dir()
+
+    # Configure logging. Records are handed to a queue and written by a
+    # background listener thread so AT-SPI callbacks never block on disk I/O.
+    import atexit
+    import queue
+    from logging.handlers import QueueHandler, QueueListener
+
+    formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler = BufferedFileHandler(
+        os.path.join(log_dir, 'pycomplete.log'), mode='a', delay=True)
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+    queue_listener = QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True)
+    queue_listener.start()
+    # Drain queued records on exit; runs before logging's own shutdown hook
+    atexit.register(queue_listener.stop)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    root_logger.addHandler(QueueHandler(log_queue))
 
     # Set level for specific loggers
     logging.getLogger('src.pycomplete').setLevel(log_level)
@@ -95,6 +179,8 @@ def setup_logging(debug_level: int):
 
 def parse_args():
     """Parse command line arguments"""
+    import argparse
+
     parser = argparse.ArgumentParser(description='PyComplete Text Predictor')
     parser.add_argument('-d', '--debug', type=int, default=0,
                         help='Debug level (0=WARNING, 1=INFO, 2=DEBUG)')
@@ -103,7 +189,8 @@ def parse_args():
     return parser.parse_args()
 
 
-if __name__ == "__main__":
+def main():
+    """Run PyComplete"""
     # Parse command line arguments
     args = parse_args()
 
@@ -141,3 +228,7 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
         sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
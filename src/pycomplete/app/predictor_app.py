@@ -1,9 +1,6 @@
-import os
-import subprocess
 import logging
 from typing import Tuple, Optional
 import asyncio
-import functools
 import time
 from gi.repository import GLib
 import pyatspi
@@ -13,6 +10,7 @@ from ..core.accessibility import AccessibilityManager
 from ..core.config import ConfigManager
 from ..core.text_field import TextFieldManager
 from ..core.prediction import OllamaPredictor
+from ..core.ydotool import YdotoolClient
 from ..ui.overlay import PredictionOverlay
 
 logger = logging.getLogger(__name__)
@@ -27,27 +25,53 @@ class TextPredictorApp(AccessibilityManager):
         # Set up logging first
         self._setup_logging(debug_level)
 
-        logger.debug(f"Initializing TextPredictorApp")
+        logger.debug("Initializing TextPredictorApp")
         self.config = ConfigManager.load_config(config_path)
         self.targets = ConfigManager.load_targets(self.config.target_file)
+        # Trigger key values looked up on every key event
+        self._trigger_key_code = self.config.trigger_key.key_code
+        self._trigger_event_string = self.config.trigger_key.event_string
         self.text_field_manager = TextFieldManager()
         self.overlay = PredictionOverlay()
+        self.ydotool = YdotoolClient()
+        self.ydotool.connect()
+        self._overlay_timer = None  # Only active while the overlay is shown
         self.current_field = None
         self.current_prediction = None
         self.last_text = ""
 
+        # Text-change coalescing
+        self.snapshot_delay = 30  # ms
+        self._pending_snapshot = None
+        self._snapshot_args = None  # (source, event_type, text_field)
+
+        # Local copy of the current field's text, kept in sync from events
+        self._mirror_source = None
+        self._mirror_text = ""
+        self._mirror_iface = None  # Text interface of _mirror_source
+
         # Debouncing variables
         self.last_request_time = 0
         self.debounce_delay = 0.25  # Increased to 250ms
         self._pending_content = None
         self._pending_timer = None
         self._current_task = None
-        self._processing_prediction = False  # Flag to track active predictions
 
         # Initialize asyncio loop and session
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
-        self.session = aiohttp.ClientSession()
+        # Keep connections to the local Ollama server alive between
+        # predictions instead of reconnecting for each request
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=4,
+                limit_per_host=4,
+                keepalive_timeout=300,
+                loop=self.loop
+            ),
+            timeout=aiohttp.ClientTimeout(
+                total=None, sock_connect=2, sock_read=30)
+        )
 
         # Set up async predictor
         self.predictor = OllamaPredictor(
@@ -60,25 +84,27 @@ class TextPredictorApp(AccessibilityManager):
 
         # Set up async integration with GLib
         self._setup_loop_integration()
+        self.loop.create_task(self.predictor.warm_up())
+        self._wake_async_loop()
         # Register accessibility events
         logger.debug("Registering accessibility events")
-        self.register_event('object:text-changed:insert',
-                            self._on_text_changed)
-        self.register_event('object:text-changed:delete',
+        # One registration covers both :insert and :delete; the handler
+        # dispatches on event.type
+        self.register_event('object:text-changed',
                             self._on_text_changed)
-        self.register_keystroke(
-            self._on_key,
-            kind=(pyatspi.KEY_PRESSED_EVENT, pyatspi.KEY_RELEASED_EVENT)
-        )
-
-        # Set up overlay update interval
-        GLib.timeout_add(50, self._update_overlay)
+        self.register_event('window:deactivate',
+                            self._on_window_deactivate)
+        # The keystroke listener is synchronous, so it is only registered
+        # while a prediction is waiting to be accepted
+        self._keystroke_registered = False
+        # Set between accepting a prediction and the trigger key release
+        self._trigger_release_pending = False
 
         logger.info("Initialization complete")
 
     def register_event(self, event_type, handler):
         """Register an event handler with logging"""
-        logger.debug(f"Registering event handler for {event_type}")
+        logger.debug("Registering event handler for %s", event_type)
         super().register_event(event_type, handler)
 
     def register_keystroke(self, handler, **kwargs):
@@ -86,6 +112,22 @@ class TextPredictorApp(AccessibilityManager):
         logger.debug("Registering keystroke handler")
         super().register_keystroke(handler, **kwargs)
 
+    def deregister_keystroke(self, handler, **kwargs):
+        """Deregister a keystroke handler with logging"""
+        logger.debug("Deregistering keystroke handler")
+        super().deregister_keystroke(handler, **kwargs)
+
+    def _set_key_listening(self, enabled: bool):
+        """Register or deregister the keystroke handler as needed"""
+        if enabled == self._keystroke_registered:
+            return
+        kind = (pyatspi.KEY_PRESSED_EVENT, pyatspi.KEY_RELEASED_EVENT)
+        if enabled:
+            self.register_keystroke(self._on_key, kind=kind)
+        else:
+            self.deregister_keystroke(self._on_key, kind=kind)
+        self._keystroke_registered = enabled
+
     def _setup_logging(self, debug_level: int):
         """Set up logging with the specified debug level"""
         log_levels = {
@@ -109,18 +151,30 @@ class TextPredictorApp(AccessibilityManager):
     def _setup_loop_integration(self):
         """Set up integration between asyncio and GLib main loops"""
         logger.debug("Setting up event loop integration")
+        # asyncio work is pumped from a GLib timeout that only runs while
+        # there are tasks, so an idle app does not wake up periodically
+        self.async_poll_interval = 10  # ms
+        self._async_pump = None
+
+    def _wake_async_loop(self):
+        """Start pumping asyncio events if not already doing so"""
+        if not self._async_pump:
+            self._async_pump = GLib.timeout_add(
+                self.async_poll_interval, self._process_async_events)
+
+    def _process_async_events(self):
+        """Run one asyncio iteration; stop pumping once no tasks remain"""
+        try:
+            self.loop.stop()
+            self.loop.run_forever()
+        except Exception as e:
+            logger.error("Error processing async events: %s", e,
+                         exc_info=True)
 
-        def process_async_events():
-            try:
-                self.loop.stop()
-                self.loop.run_forever()
-            except Exception as e:
-                logger.error(f"Error processing async events: {
-                             e}", exc_info=True)
+        if asyncio.all_tasks(self.loop):
             return True
-
-        # Process async events every 50ms
-        GLib.timeout_add(50, process_async_events)
+        self._async_pump = None
+        return False
 
     def _on_text_changed(self, event):
         """Handle text change events"""
@@ -130,86 +184,171 @@ class TextPredictorApp(AccessibilityManager):
 
             text_field = self.text_field_manager.is_text_field(event.source)
             if not text_field:
+                # The skipped change is missing from the local copy
+                if event.source is self._mirror_source:
+                    self._mirror_source = None
                 return
 
             self.current_field = event.source
-            text = event.source.queryText()
-            content = text.getText(0, text.characterCount)
-
-            # Log text changes using available attributes
-            field_description = f"text field {text_field.name}"
-            if event.type.endswith(':insert'):
-                logger.info(f"Text inserted in {
-                            field_description}: '{content}'")
-            elif event.type.endswith(':delete'):
-                logger.info(f"Text deleted in {
-                            field_description}: '{content}'")
-
-            # Log details in debug mode
+
+            # Apply the change to the local copy of the field text; only
+            # read the whole text over AT-SPI when there is no usable copy
+            content = self._apply_text_change(event)
+            if content is None:
+                self._schedule_snapshot(event.source, event.type, text_field)
+                return
+
+            self._process_text(content, event.type, text_field)
+
+        except Exception as e:
+            logger.error("Error handling text change: %s", e, exc_info=True)
+
+    def _apply_text_change(self, event) -> Optional[str]:
+        """Splice an insert/delete event into the mirrored field text
+
+        Returns the updated text, or None if the mirror is missing or the
+        event does not line up with it and a full re-read is needed.
+        """
+        if event.source is not self._mirror_source or self._pending_snapshot:
+            return None
+
+        text = self._mirror_text
+        offset, length, data = event.detail1, event.detail2, event.any_data
+        if not isinstance(data, str) or len(data) != length or offset > len(text):
+            return None
+
+        if event.type.endswith(':insert'):
+            text = text[:offset] + data + text[offset:]
+        elif event.type.endswith(':delete') and text[offset:offset + length] == data:
+            text = text[:offset] + text[offset + length:]
+        else:
+            return None
+
+        self._mirror_text = text
+        return text
+
+    def _schedule_snapshot(self, source, event_type, text_field):
+        """Schedule a full read of the field contents"""
+        # Coalesce bursts of events: the read is scheduled once and uses
+        # whichever event arrived last before it runs
+        self._snapshot_args = (source, event_type, text_field)
+        if not self._pending_snapshot:
+            self._pending_snapshot = GLib.timeout_add(
+                self.snapshot_delay, self._snapshot_text)
+
+    def _snapshot_text(self):
+        """Read the field contents after a burst of text changes"""
+        self._pending_snapshot = None
+        source, event_type, text_field = self._snapshot_args
+        self._snapshot_args = None
+        try:
+            content = self._get_full_text(source)
+            if source is not self._mirror_source:
+                self._mirror_source = source
+                self._mirror_iface = None
+            self._mirror_text = content
+            self._process_text(content, event_type, text_field)
+        except Exception as e:
+            logger.error("Error reading text field: %s", e, exc_info=True)
+        return False
+
+    def _process_text(self, content: str, event_type: str, text_field):
+        """Log the current field text and request a prediction for it"""
+        # The shown prediction was for the text before this change
+        if self.current_prediction:
+            self._clear_prediction()
+
+        # Log text changes using available attributes
+        if event_type.endswith(':insert'):
+            logger.info("Text inserted in text field %s: '%s'",
+                        text_field.name, content)
+        elif event_type.endswith(':delete'):
+            logger.info("Text deleted in text field %s: '%s'",
+                        text_field.name, content)
+
+        # Log details in debug mode
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
-                f"Text field details: role={text_field.role}, "
-                f"name='{text_field.name}', "
-                f"interfaces={len(text_field.interfaces)}, "
-                f"length={len(content)}"
+                "Text field details: role=%s, name='%s', "
+                "interfaces=%d, length=%d",
+                text_field.role, text_field.name,
+                len(text_field.interfaces), len(content)
             )
 
-            self._debounce_prediction_request(content)
+        # The predictor rejects text this short anyway, so skip scheduling
+        # a request and drop any pending or running one for older text
+        if len(content) < self.predictor.min_chars:
+            self._pending_content = None
+            if self._current_task and not self._current_task.done():
+                self._current_task.cancel()
+            return
 
-        except Exception as e:
-            logger.error(f"Error handling text change: {e}", exc_info=True)
+        self._debounce_prediction_request(content)
+
+    def _on_window_deactivate(self, event):
+        """Drop cached text fields when their window loses focus"""
+        self._mirror_source = None
+        self._mirror_text = ""
+        self._mirror_iface = None
+        self.text_field_manager.invalidate()
 
     def _on_key(self, event):
         """Handle keyboard events"""
         try:
-            if not self.current_field or not self.current_prediction:
+            if not self._is_trigger_key(event):
                 return False
 
-            if self._is_trigger_key(event):
-                if event.type == pyatspi.KEY_PRESSED_EVENT:
-                    logger.info(f"Trigger key pressed, accepting prediction: '{
-                                self.current_prediction}'")
-                    self._insert_prediction(self.current_prediction)
+            if event.type == pyatspi.KEY_PRESSED_EVENT:
+                if not self.current_field or not self.current_prediction:
+                    return False
+                logger.info("Trigger key pressed, accepting prediction: '%s'",
+                            self.current_prediction)
+                self._insert_prediction(self.current_prediction)
                 return True
 
+            # Consume the release of the accepting key press too, so the
+            # focused application sees neither; then stop listening
+            if self._trigger_release_pending:
+                self._trigger_release_pending = False
+                self._set_key_listening(False)
+                return True
             return False
         except Exception as e:
-            logger.error(f"Error handling key event: {e}", exc_info=True)
+            logger.error("Error handling key event: %s", e, exc_info=True)
             return False
 
     def _is_trigger_key(self, event) -> bool:
         """Check if event matches trigger key"""
         return (
-            event.event_string == self.config.trigger_key.event_string or
-            getattr(event, 'id', None) == self.config.trigger_key.key_code
+            getattr(event, 'id', None) == self._trigger_key_code or
+            event.event_string == self._trigger_event_string
         )
 
     def _insert_prediction(self, text: str):
         """Insert prediction text"""
         try:
-            logger.info(f"Inserting prediction: '{text}'")
-            subprocess.run(['ydotool', 'type', ' ' + text], check=True)
-            self.current_prediction = None
-            self.overlay.hide()
+            logger.info("Inserting prediction: '%s'", text)
+            # Keep listening until the trigger key is released
+            self._trigger_release_pending = True
+            self._clear_prediction()
+            self.ydotool.type_text(' ' + text)
         except Exception as e:
-            logger.error(f"Error inserting prediction: {e}", exc_info=True)
+            logger.error("Error inserting prediction: %s", e, exc_info=True)
+
+    def _clear_prediction(self):
+        """Drop the shown prediction and stop listening for the trigger key"""
+        self.current_prediction = None
+        if not self._trigger_release_pending:
+            self._set_key_listening(False)
+        self.overlay.hide()
 
     def _debounce_prediction_request(self, content: str):
         """Debounce prediction requests using time-based approach"""
-        current_time = time.time()
+        current_time = time.monotonic()
 
-        # Cancel any existing pending timer
+        # Cancel any existing pending request
         if self._pending_timer:
-            try:
-                GLib.source_remove(self._pending_timer)
-                self._pending_timer = None
-            except Exception:
-                pass
-
-        # Don't cancel existing task if it's still processing
-        if self._current_task and not self._current_task.done() and self._processing_prediction:
-            logger.debug(
-                "Skipping prediction request - previous task still processing")
-            return
+            GLib.source_remove(self._pending_timer)
 
         # Store the pending content
         self._pending_content = content
@@ -218,9 +357,10 @@ class TextPredictorApp(AccessibilityManager):
         time_since_last = current_time - self.last_request_time
         delay = max(0, int((self.debounce_delay - time_since_last) * 1000))
 
-        logger.debug(f"Scheduling prediction request with {delay}ms delay")
+        logger.debug("Scheduling prediction request with %dms delay", delay)
 
-        # Schedule the request
+        # A single GLib timeout waits out the debounce; the asyncio loop
+        # is only pumped once the prediction task exists
         self._pending_timer = GLib.timeout_add(
             delay,
             self._execute_prediction_request
@@ -232,30 +372,30 @@ class TextPredictorApp(AccessibilityManager):
         if not self._pending_content:
             return False
 
-        content = self._pending_content
+        content = self._check_mirror(self._pending_content)
         self._pending_content = None
-        self.last_request_time = time.time()
+        self.last_request_time = time.monotonic()
 
-        if self._processing_prediction:
-            logger.debug(
-                "Skipping prediction - previous prediction in progress")
-            return False
+        # A prediction for older content is stale now; cancel it so the
+        # newest text gets predicted instead of being dropped
+        if self._current_task and not self._current_task.done():
+            logger.debug("Cancelling stale prediction in progress")
+            self._current_task.cancel()
 
-        logger.debug(f"Executing prediction request for content of length {
-                     len(content)}")
+        logger.debug("Executing prediction request for content of length %d",
+                     len(content))
 
-        self._processing_prediction = True
         self._current_task = self.loop.create_task(
             self._async_predict(content))
+        self._wake_async_loop()
 
         def handle_task_result(task):
-            self._processing_prediction = False
             try:
                 task.result()
             except asyncio.CancelledError:
                 logger.debug("Prediction task cancelled")
             except Exception as e:
-                logger.error(f"Prediction task failed: {e}", exc_info=True)
+                logger.error("Prediction task failed: %s", e, exc_info=True)
 
         self._current_task.add_done_callback(handle_task_result)
         return False
@@ -263,42 +403,81 @@ class TextPredictorApp(AccessibilityManager):
     async def _async_predict(self, content: str):
         """Asynchronously get prediction and update UI"""
         try:
-            logger.debug(f"Starting async prediction for: '{content}'")
+            logger.debug("Starting async prediction for: '%s'", content)
 
             # Get prediction
             result = await self.predictor.predict(content)
 
             if result.text:
-                logger.info(f"Prediction received: '{result.text}'")
-                logger.debug(f"Prediction metadata: {result.metadata}")
+                logger.info("Prediction received: '%s'", result.text)
+                logger.debug("Prediction metadata: %s", result.metadata)
                 # Update UI in main thread
                 GLib.idle_add(lambda: self._handle_prediction(result.text))
             else:
-                logger.debug(f"No prediction available: {
-                             result.metadata['reason']}")
+                logger.debug("No prediction available: %s",
+                             result.metadata['reason'])
+                if self.current_prediction:
+                    self._clear_prediction()
 
         except asyncio.CancelledError:
             logger.debug("Prediction cancelled")
             raise
         except Exception as e:
-            logger.error(f"Error in prediction: {e}", exc_info=True)
+            logger.error("Error in prediction: %s", e, exc_info=True)
             raise
 
     def _handle_prediction(self, prediction: str) -> bool:
         """Handle prediction result"""
         try:
             self.current_prediction = prediction
+            self._set_key_listening(True)
             if self.current_field:
                 x, y = self._get_cursor_position(self.current_field)
                 logger.debug(
                     f"Showing prediction overlay at coordinates ({x}, {y})")
                 self.overlay.show(prediction, x, y)
+                if not self._overlay_timer:
+                    self._overlay_timer = GLib.timeout_add(
+                        50, self._update_overlay)
             return False
         except Exception as e:
-            logger.error(f"Error handling prediction result: {
-                         e}", exc_info=True)
+            logger.error("Error handling prediction result: %s", e,
+                         exc_info=True)
             return False
 
+    def _check_mirror(self, content: str) -> str:
+        """Re-read the field if the local copy no longer matches its length
+
+        The copy can drift, e.g. when an event that was already queued
+        while a snapshot was read gets applied on top of it; checking once
+        per request keeps that from lasting.
+        """
+        source = self._mirror_source
+        if source is None:
+            return content
+        try:
+            # The Text interface is looked up once per field, so the check
+            # is a single characterCount round-trip per request
+            if self._mirror_iface is None:
+                self._mirror_iface = source.queryText()
+            text = self._mirror_iface
+            if text.characterCount == len(self._mirror_text):
+                return content
+            logger.debug("Local copy of the field text drifted, re-reading")
+            self._mirror_text = text.getText(0, -1)
+            return self._mirror_text
+        except Exception as e:
+            logger.debug("Error checking field text: %s", e)
+            self._mirror_source = None
+            self._mirror_iface = None
+            return content
+
+    def _get_full_text(self, obj) -> str:
+        """Get the entire text of an object in a single AT-SPI call"""
+        # An end offset of -1 means "to the end of the text", which saves
+        # the separate characterCount round-trip
+        return obj.queryText().getText(0, -1)
+
     def _get_cursor_position(self, obj) -> Tuple[int, int]:
         """Get cursor coordinates"""
         try:
@@ -312,16 +491,19 @@ class TextPredictorApp(AccessibilityManager):
             )[:2]
             return abs_x + x, abs_y + y
         except Exception as e:
-            logger.error(f"Error getting cursor position: {e}", exc_info=True)
+            logger.error("Error getting cursor position: %s", e, exc_info=True)
             return 0, 0
 
     def _update_overlay(self):
-        """Update the overlay window"""
+        """Update the overlay window while it is visible"""
         try:
             self.overlay.update()
         except Exception as e:
-            logger.error(f"Error updating overlay: {e}", exc_info=True)
-        return True
+            logger.error("Error updating overlay: %s", e, exc_info=True)
+        if self.overlay.visible:
+            return True
+        self._overlay_timer = None
+        return False
 
     def cleanup(self):
         """Cleanup resources"""
@@ -333,13 +515,27 @@ class TextPredictorApp(AccessibilityManager):
                 logger.debug("Cancelling current prediction task")
                 self._current_task.cancel()
 
-            # Cancel pending timer
+            # Stop pumping asyncio events from GLib
+            if self._async_pump:
+                GLib.source_remove(self._async_pump)
+
+            # Stop overlay updates
+            if self._overlay_timer:
+                logger.debug("Removing overlay update timer")
+                GLib.source_remove(self._overlay_timer)
+
+            # Cancel pending text snapshot
+            if self._pending_snapshot:
+                logger.debug("Removing pending text snapshot")
+                GLib.source_remove(self._pending_snapshot)
+
+            # Cancel pending prediction request
             if self._pending_timer:
-                try:
-                    logger.debug("Removing pending timer")
-                    GLib.source_remove(self._pending_timer)
-                except Exception:
-                    pass
+                logger.debug("Removing pending prediction request")
+                GLib.source_remove(self._pending_timer)
+
+            # Close ydotoold connection
+            self.ydotool.close()
 
             # Close aiohttp session
             if hasattr(self, 'session'):
@@ -361,4 +557,4 @@ class TextPredictorApp(AccessibilityManager):
             logger.info("Cleanup complete")
 
         except Exception as e:
-            logger.error(f"Error during cleanup: {e}", exc_info=True)
+            logger.error("Error during cleanup: %s", e, exc_info=True)
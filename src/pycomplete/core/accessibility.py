@@ -1,14 +1,13 @@
-from abc import ABC, abstractmethod
-import pyatspi
-from gi.repository import GLib, Atspi
+from abc import ABC
 import gi
-import os
+gi.require_version('Atspi', '2.0')
+gi.require_version('GLib', '2.0')
+from gi.repository import GLib
+import pyatspi
 import signal
 import sys
 import logging
 
-gi.require_version('Atspi', '2.0')
-
 logger = logging.getLogger(__name__)
 
 
@@ -34,6 +33,15 @@ class AccessibilityManager(ABC):
             kind=kwargs.get('kind', [0])
         )
 
+    def deregister_keystroke(self, handler, **kwargs):
+        """Deregister a keystroke handler"""
+        pyatspi.Registry.deregisterKeystrokeListener(
+            handler,
+            key_set=kwargs.get('key_set', None),
+            mask=kwargs.get('mask', 0),
+            kind=kwargs.get('kind', [0])
+        )
+
     def cleanup(self):
         """Cleanup registered handlers"""
         if self._cleanup_done:
@@ -1,11 +1,50 @@
 from dataclasses import dataclass
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# path -> (st_mtime_ns, parsed data)
+_json_cache: Dict[str, Tuple[int, Any]] = {}
+
+
+def _read_json(path: str) -> Any:
+    """Read a JSON file, using orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _load_json_cached(path: str) -> Any:
+    """Read a JSON file, reusing the parsed result while its mtime is unchanged"""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    data = _read_json(path)
+    _json_cache[path] = (mtime, data)
+    return data
+
+
+def _write_json(path: str, data: Any):
+    """Write data as indented JSON, using orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
 
 @dataclass
 class KeyConfig:
@@ -29,8 +68,7 @@ class ConfigManager:
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"Config file not found: {config_path}")
 
-        with open(config_path, 'r') as f:
-            data = json.load(f)
+        data = _load_json_cached(config_path)
 
         trigger_key = KeyConfig(**data['trigger_key'])
         return AppConfig(
@@ -48,8 +86,7 @@ class ConfigManager:
                 'key_code': config.trigger_key.key_code
             }
         }
-        with open(path, 'w') as f:
-            json.dump(data, f, indent=2)
+        _write_json(path, data)
 
     @staticmethod
     def load_targets(target_file: str) -> list:
@@ -58,5 +95,4 @@ class ConfigManager:
             logger.warning(f"No targets file found at {target_file}")
             return []
 
-        with open(target_file, 'r') as f:
-            return json.load(f)
+        return _load_json_cached(target_file)
@@ -1,13 +1,30 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any
 import aiohttp
 import json
 import time
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Parser for streamed response chunks; orjson.JSONDecodeError subclasses
+# json.JSONDecodeError, so error handling is the same for both
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
 
 @dataclass
 class PredictionResult:
@@ -31,7 +48,8 @@ class LlmPredictor(TextPredictor):
     def __init__(self,
                  trigger: str = " ",
                  min_chars: int = 3,
-                 idle_delay: float = 1.0):
+                 idle_delay: float = 1.0,
+                 cache_size: int = 512):
         """
         Initialize LLM predictor
 
@@ -39,29 +57,29 @@ class LlmPredictor(TextPredictor):
             trigger (str): Character that triggers prediction (default: space)
             min_chars (int): Minimum characters needed before predictions start
             idle_delay (float): Time in seconds to wait before predicting without trigger
+            cache_size (int): Number of segment completions to keep in memory
         """
+        # An empty trigger would match at every position of the text
+        if not trigger:
+            raise ValueError("trigger must be a non-empty string")
         self.trigger = trigger
         self.min_chars = min_chars
         self.idle_delay = idle_delay
+        self.cache_size = cache_size
         self.last_input_time = 0.0
         self.last_text = ""
+        # LRU of segment -> completion, so repeated segments skip the LLM
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
         self.logger = logging.getLogger(__name__)
         self.logger.info(
-            f"Initialized LLM predictor with: trigger='{trigger}', "
-            f"min_chars={min_chars}, idle_delay={idle_delay}s"
+            "Initialized LLM predictor with: trigger='%s', "
+            "min_chars=%d, idle_delay=%ss",
+            trigger, min_chars, idle_delay
         )
 
     async def predict(self, text: str) -> PredictionResult:
         """Generate prediction using configured LLM"""
-        metadata = {
-            'trigger_type': None,
-            'segment_length': 0,
-            'prediction_time': 0,
-            'reason': None,
-            'input_text': text
-        }
-
-        current_time = time.time()
+        current_time = time.monotonic()
         text_changed = text != self.last_text
 
         # Update input timing if text changed
@@ -72,18 +90,23 @@ class LlmPredictor(TextPredictor):
         # Check if we should predict
         should_predict, trigger_type, reason = self._should_predict(
             text, current_time)
-        metadata.update({
-            'trigger_type': trigger_type,
-            'reason': reason
-        })
 
         if not should_predict:
-            self.logger.debug(f"Skipping prediction: {
-                              reason} for text '{text}'")
-            return PredictionResult(None, metadata)
+            self.logger.debug(
+                "Skipping prediction: %s for text '%s'", reason, text)
+            # Most calls end here, so only the reason is reported
+            return PredictionResult(None, {'reason': reason})
+
+        metadata = {
+            'trigger_type': trigger_type,
+            'segment_length': 0,
+            'prediction_time': 0,
+            'reason': reason,
+            'input_text': text
+        }
 
         try:
-            start_time = time.time()
+            start_time = time.monotonic()
 
             # Get the relevant segment for prediction
             segment = self._get_prediction_segment(text)
@@ -92,33 +115,50 @@ class LlmPredictor(TextPredictor):
                 return PredictionResult(None, metadata)
 
             metadata['segment_length'] = len(segment)
+
+            cached = self._cache.get(segment)
+            if cached is not None:
+                self._cache.move_to_end(segment)
+                metadata['reason'] = "cache_hit"
+                self.logger.debug(
+                    "Using cached prediction for '%s': '%s'", segment, cached)
+                return PredictionResult(cached, metadata)
+
             self.logger.info(
-                f"Starting prediction for '{segment}' "
-                f"(trigger: {trigger_type})"
+                "Starting prediction for '%s' (trigger: %s)",
+                segment, trigger_type
             )
 
             # Get prediction from specific LLM implementation
             completion = await self._get_llm_prediction(segment)
 
             if completion:
-                metadata['prediction_time'] = time.time() - start_time
+                metadata['prediction_time'] = time.monotonic() - start_time
+                self._cache_completion(segment, completion)
                 self.logger.info(
-                    f"Prediction successful: '{completion}' "
-                    f"(took {metadata['prediction_time']:.3f}s)"
+                    "Prediction successful: '%s' (took %.3fs)",
+                    completion, metadata['prediction_time']
                 )
                 return PredictionResult(completion, metadata)
             else:
                 metadata['reason'] = "No completion received"
                 self.logger.debug(
-                    f"No completion received from LLM for '{segment}'")
+                    "No completion received from LLM for '%s'", segment)
 
         except Exception as e:
             metadata['reason'] = f"Error: {str(e)}"
-            self.logger.error(f"Error generating prediction: {
-                              e}", exc_info=True)
+            self.logger.error(
+                "Error generating prediction: %s", e, exc_info=True)
 
         return PredictionResult(None, metadata)
 
+    def _cache_completion(self, segment: str, completion: str):
+        """Remember a completion, evicting the least recently used entry"""
+        self._cache[segment] = completion
+        self._cache.move_to_end(segment)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
     def _should_predict(self, text: str, current_time: float) -> tuple[bool, Optional[str], str]:
         """
         Check if prediction should be attempted
@@ -135,7 +175,7 @@ class LlmPredictor(TextPredictor):
         # Check for trigger character
         if text.endswith(self.trigger):
             self.logger.debug(
-                f"Trigger character detected at end of: '{text}'")
+                "Trigger character detected at end of: '%s'", text)
             return True, "trigger_char", "Trigger character detected"
 
         # Check for idle timeout
@@ -143,28 +183,41 @@ class LlmPredictor(TextPredictor):
         if time_since_input >= self.idle_delay:
             if not text.endswith(self.trigger):
                 self.logger.debug(
-                    f"Idle timeout ({time_since_input:.2f}s) for text: '{text}'")
+                    "Idle timeout (%.2fs) for text: '%s'",
+                    time_since_input, text)
                 return True, "idle_timeout", f"Idle timeout ({time_since_input:.2f}s)"
 
         return False, None, "No trigger condition met"
 
     def _get_prediction_segment(self, text: str) -> Optional[str]:
         """Get the appropriate text segment for prediction"""
-        if text.endswith(self.trigger):
-            # If triggered by space, use last complete segment
-            segments = text.split(self.trigger)
-            segments = [s.strip() for s in segments if s.strip()]
-            return segments[-1] if segments else None
-        else:
-            # If triggered by idle timeout, use current incomplete segment
-            segments = text.split(self.trigger)
-            last_segment = segments[-1].strip()
-            return last_segment if last_segment else None
+        # Only the last segment is needed, so scan back from the end
+        # instead of splitting the whole text
+        trigger = self.trigger
+        triggered = text.endswith(trigger)
+        end = len(text)
+        while True:
+            start = text.rfind(trigger, 0, end)
+            segment = text[start + len(trigger) if start >= 0 else 0:end].strip()
+            # If triggered by space, use last complete segment; if
+            # triggered by idle timeout, use current incomplete segment
+            if segment or start < 0 or not triggered:
+                return segment or None
+            end = start
 
 
 class OllamaPredictor(LlmPredictor):
     """Predictor that uses Ollama server for text completion"""
 
+    # Only a short completion is shown, so reading stops at the first
+    # sentence boundary or once enough text has arrived. These are not
+    # sent as Ollama stop sequences, which would drop the punctuation
+    stop_sequences = (".", "?", "!", "\n")
+    max_completion_chars = 40
+
+    # Stands in for the prompt when pre-serializing the request body
+    _prompt_placeholder = "__PROMPT__"
+
     def __init__(self,
                  model: str = "mistral",
                  base_url: str = "http://localhost:11434",
@@ -179,15 +232,42 @@ class OllamaPredictor(LlmPredictor):
         self.session = session
         self._connection_verified = False
 
+        # Everything but the prompt is the same for every request, so the
+        # body is serialized once and the prompt spliced in per request
+        skeleton = _json_dumps({
+            "model": self.model,
+            "prompt": self._prompt_placeholder,
+            "stream": True,
+            "options": {
+                "temperature": 0.7,
+                "top_k": 50,
+                "top_p": 0.9,
+                "max_tokens": 20,
+            }
+        })
+        self._body_head, _, self._body_tail = skeleton.partition(
+            _json_dumps(self._prompt_placeholder))
+
         # Ensure session is available
         if not self.session:
             raise ValueError("aiohttp session is required")
 
         self.logger.info(
-            f"Initialized Ollama predictor with model '{model}' "
-            f"(trigger='{trigger}', idle_delay={idle_delay}s)"
+            "Initialized Ollama predictor with model '%s' "
+            "(trigger='%s', idle_delay=%ss)",
+            model, trigger, idle_delay
         )
 
+    async def warm_up(self):
+        """Open a pooled connection to the Ollama server ahead of the first prediction"""
+        try:
+            async with self.session.get(f"{self.base_url}/api/tags") as response:
+                await response.read()
+                self.logger.debug(
+                    "Ollama connection warmed up (status %s)", response.status)
+        except Exception as e:
+            self.logger.warning("Could not warm up Ollama connection: %s", e)
+
     async def verify_connection(self) -> bool:
         """Verify connection to Ollama server"""
         try:
@@ -201,13 +281,14 @@ class OllamaPredictor(LlmPredictor):
 
             async with self.session.post(url, json=data) as response:
                 if response.status != 200:
-                    self.logger.error(f"Failed to connect to Ollama server: Status {
-                                      response.status}")
+                    self.logger.error(
+                        "Failed to connect to Ollama server: Status %s",
+                        response.status)
                     return False
                 self.logger.info("Successfully connected to Ollama server")
                 return True
         except Exception as e:
-            self.logger.error(f"Failed to connect to Ollama server: {e}")
+            self.logger.error("Failed to connect to Ollama server: %s", e)
             return False
 
     async def _get_llm_prediction(self, text: str) -> Optional[str]:
@@ -221,54 +302,60 @@ class OllamaPredictor(LlmPredictor):
                     return None
                 self._connection_verified = True
 
-            self.logger.info(f"Sending request to Ollama for text: '{text}'")
+            self.logger.info("Sending request to Ollama for text: '%s'", text)
             url = f"{self.base_url}/api/generate"
-            data = {
-                "model": self.model,
-                "prompt": f"Complete this sentence naturally and briefly: {text}",
-                "stream": True,
-                "options": {
-                    "temperature": 0.7,
-                    "top_k": 50,
-                    "top_p": 0.9,
-                    "max_tokens": 20,
-                }
-            }
+            prompt = f"Complete this sentence naturally and briefly: {text}"
+            body = self._body_head + _json_dumps(prompt) + self._body_tail
 
             completion = ""
-            start_time = time.time()
-
-            async with self.session.post(url, json=data) as response:
+            start_time = time.monotonic()
+            # Looked up once instead of on every streamed chunk
+            loads = _json_loads
+            stop_sequences = self.stop_sequences
+            max_chars = self.max_completion_chars
+
+            async with self.session.post(
+                    url, data=body,
+                    headers={'Content-Type': 'application/json'}) as response:
                 if response.status != 200:
-                    self.logger.error(f"Ollama server returned status {
-                                      response.status}")
+                    self.logger.error(
+                        "Ollama server returned status %s", response.status)
                     return None
 
                 async for line in response.content:
                     try:
-                        chunk = json.loads(line)
-                        if 'response' in chunk:
-                            completion += chunk['response']
+                        chunk = loads(line)
                         if chunk.get('done', False):
                             break
+                        piece = chunk.get('response', '')
+                        completion += piece
+                        # Leaving the block closes the response, so the
+                        # server stops generating text that won't be shown;
+                        # a boundary before any text (e.g. a leading
+                        # newline) does not end the completion
+                        if (len(completion) >= max_chars or
+                                (completion.strip() and
+                                 any(s in piece for s in stop_sequences))):
+                            break
                     except json.JSONDecodeError as e:
-                        self.logger.error(f"Error decoding JSON chunk: {e}")
+                        self.logger.error("Error decoding JSON chunk: %s", e)
                         continue
 
-            elapsed = time.time() - start_time
+            elapsed = time.monotonic() - start_time
             if completion.strip():
                 self.logger.info(
-                    f"Ollama response received in {
-                        elapsed:.3f}s: '{completion.strip()}'"
+                    "Ollama response received in %.3fs: '%s'",
+                    elapsed, completion.strip()
                 )
             else:
                 self.logger.warning(
-                    f"Empty completion received from Ollama after {elapsed:.3f}s")
+                    "Empty completion received from Ollama after %.3fs",
+                    elapsed)
             return completion.strip()
 
         except Exception as e:
-            self.logger.error(f"Error in Ollama prediction: {
-                              e}", exc_info=True)
+            self.logger.error(
+                "Error in Ollama prediction: %s", e, exc_info=True)
             return None
 
     async def cleanup(self):
@@ -1,12 +1,36 @@
-from dataclasses import dataclass
-from typing import List, Dict, Set, Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, List, Dict, FrozenSet, Optional
+from gi.repository import GLib
 import pyatspi
 import logging
+import sys
+import time
+import weakref
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
+_TEXT_FIELD_ROLES = frozenset({
+    pyatspi.ROLE_TEXT,
+    pyatspi.ROLE_ENTRY,
+    pyatspi.ROLE_DOCUMENT_TEXT,
+    pyatspi.ROLE_PARAGRAPH,
+    pyatspi.ROLE_DOCUMENT_FRAME,
+    pyatspi.ROLE_EDITBAR,
+    pyatspi.ROLE_TERMINAL,
+    pyatspi.ROLE_VIEWPORT,
+    pyatspi.ROLE_SCROLL_PANE,
+    pyatspi.ROLE_APPLICATION
+})
+
+_REQUIRED_INTERFACES = frozenset({
+    'Text',
+    'EditableText',
+    'Component'
+})
+
+
+@dataclass(slots=True, frozen=True)
 class TextFieldPath:
     role: int
     name: str
@@ -14,78 +38,172 @@ class TextFieldPath:
     role_name: str
 
 
-@dataclass
+@dataclass(slots=True, init=False)
 class TextField:
     role: int
-    interfaces: Set[str]
-    path: List[TextFieldPath]
+    interfaces: FrozenSet[str]
     name: str
-    attributes: Dict[str, str]
+    # Path and attributes take several AT-SPI calls and are rarely
+    # needed, so they are only queried on first access
+    path_fn: Callable[[], List[TextFieldPath]] = field(repr=False)
+    attributes_fn: Callable[[], Dict[str, str]] = field(repr=False)
+    _path: Optional[List[TextFieldPath]] = field(
+        default=None, repr=False, compare=False)
+    _attributes: Optional[Dict[str, str]] = field(
+        default=None, repr=False, compare=False)
+
+    def __init__(self, role: int, interfaces: FrozenSet[str],
+                 path: Optional[List[TextFieldPath]] = None,
+                 name: str = 'unnamed',
+                 attributes: Optional[Dict[str, str]] = None, *,
+                 path_fn: Optional[Callable[[], List[TextFieldPath]]] = None,
+                 attributes_fn: Optional[Callable[[], Dict[str, str]]] = None):
+        """
+        Initialize the text field
+
+        Args:
+            role (int): AT-SPI role of the field
+            interfaces (FrozenSet[str]): AT-SPI interfaces it implements
+            path (List[TextFieldPath]): Ancestor path, if already known
+            name (str): Accessible name of the field
+            attributes (Dict[str, str]): Object attributes, if already known
+            path_fn (Callable): Queries the path when it was not given
+            attributes_fn (Callable): Queries the attributes when they
+                were not given
+        """
+        self.role = role
+        self.interfaces = interfaces
+        self.name = name
+        self.path_fn = path_fn or list
+        self.attributes_fn = attributes_fn or dict
+        self._path = path
+        self._attributes = attributes
+
+    @property
+    def path(self) -> List[TextFieldPath]:
+        """Ancestor path from the root down to this field
+
+        Entries come from the manager's ancestor cache, so an ancestor's
+        name and index reflect the time it was first seen and can be stale
+        until the cache is invalidated on window:deactivate.
+        """
+        if self._path is None:
+            self._path = self.path_fn()
+        return self._path
+
+    @property
+    def attributes(self) -> Dict[str, str]:
+        if self._attributes is None:
+            self._attributes = self.attributes_fn()
+        return self._attributes
 
 
 class TextFieldManager:
     """Manages text field detection and validation"""
 
+    # Number of accessibles whose detection result is remembered
+    cache_size = 32
+    # Seconds before a cached result is detected again from scratch
+    cache_ttl = 5.0
+    # Seconds before the states of a cached text field are checked again
+    state_ttl = 0.2
+
     def __init__(self):
-        self.text_field_roles = {
-            pyatspi.ROLE_TEXT,
-            pyatspi.ROLE_ENTRY,
-            pyatspi.ROLE_DOCUMENT_TEXT,
-            pyatspi.ROLE_PARAGRAPH,
-            pyatspi.ROLE_DOCUMENT_FRAME,
-            pyatspi.ROLE_EDITBAR,
-            pyatspi.ROLE_TERMINAL,
-            pyatspi.ROLE_VIEWPORT,
-            pyatspi.ROLE_SCROLL_PANE,
-            pyatspi.ROLE_APPLICATION
-        }
-
-        self.required_interfaces = {
-            'Text',
-            'EditableText',
-            'Component'
-        }
+        # id(obj) -> [obj, result, detected at, states checked at]; holding
+        # obj keeps its id from being reused
+        self._field_cache = OrderedDict()
+
+        # Accessible -> (path entry, parent); fields in a window share most
+        # of their ancestors, which then only have to be queried once.
+        # Entries are not refreshed when an ancestor is renamed or moved,
+        # and each one keeps its parent alive, until invalidate()
+        self._node_cache = weakref.WeakKeyDictionary()
 
     def is_text_field(self, obj) -> Optional[TextField]:
+        """Detect if an object is a valid text field, using cached results"""
+        key = id(obj)
+        now = time.monotonic()
+        entry = self._field_cache.get(key)
+        if (entry is not None and entry[0] is obj and
+                now - entry[2] < self.cache_ttl):
+            self._field_cache.move_to_end(key)
+            text_field = entry[1]
+            # Role and interfaces are static, but a field can be disabled
+            # or hidden at any time
+            if text_field is not None and now - entry[3] >= self.state_ttl:
+                if not self._is_usable(obj):
+                    return None
+                entry[3] = now
+            return text_field
+
+        text_field = self._detect_text_field(obj)
+        self._field_cache[key] = [obj, text_field, now, now]
+        self._field_cache.move_to_end(key)
+        if len(self._field_cache) > self.cache_size:
+            self._field_cache.popitem(last=False)
+        return text_field
+
+    def invalidate(self):
+        """Forget all cached detection results"""
+        self._field_cache.clear()
+        self._node_cache.clear()
+
+    def _detect_text_field(self, obj) -> Optional[TextField]:
         """Detect if an object is a valid text field"""
         try:
             role = obj.getRole()
-            states = obj.getState()
-            interfaces = set(pyatspi.listInterfaces(obj))
+
+            # Most event sources are not text fields; reject them on role
+            # alone before querying states and interfaces
+            if role not in _TEXT_FIELD_ROLES:
+                return None
+
+            interfaces = pyatspi.listInterfaces(obj)
 
             # Special handling for terminals
             if role == pyatspi.ROLE_TERMINAL:
-                return self._handle_terminal(obj, states, interfaces)
+                return self._handle_terminal(
+                    obj, role, obj.getState(), interfaces)
 
-            # Check basic conditions
-            conditions = {
-                'role_match': role in self.text_field_roles,
-                'has_interfaces': self.required_interfaces.issubset(interfaces),
-                'enabled': states.contains(pyatspi.STATE_ENABLED),
-                'visible': states.contains(pyatspi.STATE_VISIBLE)
-            }
+            # Containers like viewports and scroll panes pass the role
+            # check but lack the text interfaces; states are only
+            # queried for objects that have them
+            if not _REQUIRED_INTERFACES.issubset(interfaces):
+                return None
 
-            if all(conditions.values()):
+            states = obj.getState()
+            if (states.contains(pyatspi.STATE_ENABLED) and
+                    states.contains(pyatspi.STATE_VISIBLE)):
                 return TextField(
                     role=role,
-                    interfaces=interfaces,
-                    path=self._get_path(obj),
+                    interfaces=frozenset(interfaces),
                     name=obj.name or 'unnamed',
-                    attributes=self._get_attributes(obj)
+                    path_fn=lambda: self._get_path(obj),
+                    attributes_fn=lambda: self._get_attributes(obj)
                 )
-        except Exception as e:
-            logger.debug(f"Error checking text field: {e}")
+        except (GLib.Error, LookupError) as e:
+            logger.debug("Error checking text field: %s", e)
         return None
 
-    def _handle_terminal(self, obj, states, interfaces):
+    def _is_usable(self, obj) -> bool:
+        """Check that an object is still enabled and visible"""
+        try:
+            states = obj.getState()
+            return (states.contains(pyatspi.STATE_ENABLED) and
+                    states.contains(pyatspi.STATE_VISIBLE))
+        except (GLib.Error, LookupError) as e:
+            logger.debug("Error checking text field state: %s", e)
+            return False
+
+    def _handle_terminal(self, obj, role, states, interfaces):
         """Special handling for terminal windows"""
         if states.contains(pyatspi.STATE_ENABLED) and states.contains(pyatspi.STATE_VISIBLE):
             return TextField(
-                role=obj.getRole(),
-                interfaces=interfaces,
-                path=self._get_path(obj),
+                role=role,
+                interfaces=frozenset(interfaces),
                 name=obj.name or 'unnamed',
-                attributes={}
+                path_fn=lambda: self._get_path(obj),
+                attributes_fn=dict
             )
         return None
 
@@ -95,20 +213,33 @@ class TextFieldManager:
         current = obj
         while current:
             try:
-                path.append(TextFieldPath(
-                    role=current.getRole(),
-                    name=current.name,
-                    index=current.getIndexInParent(),
-                    role_name=current.getRoleName()
-                ))
-                current = current.parent
-            except Exception:
+                cached = self._node_cache.get(current)
+                if cached is None:
+                    # Role names come from a small fixed set, so entries
+                    # share interned strings; names such as window titles
+                    # keep changing and interned strings are never freed
+                    cached = (TextFieldPath(
+                        role=current.getRole(),
+                        name=current.name,
+                        index=current.getIndexInParent(),
+                        role_name=sys.intern(current.getRoleName())
+                    ), current.parent)
+                    self._node_cache[current] = cached
+                node, current = cached
+                path.append(node)
+            except (GLib.Error, LookupError):
                 break
-        return path[::-1]
+        # Collected leaf first; reverse in place rather than copying
+        path.reverse()
+        return path
 
     def _get_attributes(self, obj) -> Dict[str, str]:
         """Get object attributes"""
         try:
-            return dict([attr.split(':', 1) for attr in obj.getAttributes()])
-        except Exception:
+            attributes = obj.getAttributes()
+        except (GLib.Error, LookupError):
             return {}
+        # Attributes without a ':' separator are malformed; skip them
+        return {key: value for key, sep, value in
+                (attr.partition(':') for attr in attributes)
+                if sep}
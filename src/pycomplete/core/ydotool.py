@@ -0,0 +1,150 @@
+import logging
+import os
+import socket
+import struct
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Linux input event constants (linux/input-event-codes.h)
+EV_SYN = 0x00
+EV_KEY = 0x01
+SYN_REPORT = 0
+KEY_LEFTSHIFT = 42
+
+# struct input_event: struct timeval time; __u16 type; __u16 code; __s32 value
+_INPUT_EVENT = struct.Struct('llHHi')
+
+
+def _build_keymap() -> Dict[str, Tuple[int, bool]]:
+    """Map characters to (key code, needs shift) for a US keyboard layout"""
+    keymap = {}
+    rows = (
+        ('1234567890-=', '!@#$%^&*()_+', 2),
+        ('qwertyuiop[]', 'QWERTYUIOP{}', 16),
+        ("asdfghjkl;'`", 'ASDFGHJKL:"~', 30),
+        ('\\zxcvbnm,./', '|ZXCVBNM<>?', 43),
+    )
+    for plain, shifted, first_code in rows:
+        for offset, (char, shifted_char) in enumerate(zip(plain, shifted)):
+            keymap[char] = (first_code + offset, False)
+            keymap[shifted_char] = (first_code + offset, True)
+    keymap['\t'] = (15, False)
+    keymap['\n'] = (28, False)
+    keymap[' '] = (57, False)
+    return keymap
+
+
+_KEYMAP = _build_keymap()
+
+
+def get_socket_path() -> str:
+    """Get the path of the ydotoold socket, following ydotool's lookup order"""
+    path = os.environ.get('YDOTOOL_SOCKET')
+    if path:
+        return path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        path = os.path.join(runtime_dir, '.ydotool_socket')
+        if os.path.exists(path):
+            return path
+    return '/tmp/.ydotool_socket'
+
+
+class YdotoolClient:
+    """Types text by writing input events directly to the ydotoold socket"""
+
+    def __init__(self, socket_path: Optional[str] = None,
+                 key_hold: int = 20, key_delay: int = 12):
+        """
+        Initialize the client
+
+        Args:
+            socket_path (str): ydotoold socket, found like ydotool does if unset
+            key_hold (int): Milliseconds each key is held down
+            key_delay (int): Milliseconds to wait between keys
+
+        The timing defaults match `ydotool type`; some clients (XWayland,
+        Chromium/Electron) drop keys or lose the shift state when events
+        arrive back to back.
+        """
+        self.socket_path = socket_path or get_socket_path()
+        self.key_hold = key_hold
+        self.key_delay = key_delay
+        self._sock = None
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def connect(self) -> bool:
+        """Connect to ydotoold, returning False if the socket is unavailable"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            logger.warning(
+                "Could not connect to ydotoold at %s, falling back to the "
+                "ydotool command: %s", self.socket_path, e)
+            return False
+
+        self._sock = sock
+        logger.info("Connected to ydotoold at %s", self.socket_path)
+        return True
+
+    def type_text(self, text: str):
+        """Type text, using the ydotool command if the socket is not usable"""
+        if self._sock is not None:
+            try:
+                hold = self.key_hold / 1000
+                delay = self.key_delay / 1000
+                for press, release in self._encode(text):
+                    for packet in press:
+                        self._sock.send(packet)
+                    time.sleep(hold)
+                    for packet in release:
+                        self._sock.send(packet)
+                    time.sleep(delay)
+                return
+            except OSError as e:
+                logger.warning("Lost connection to ydotoold: %s", e)
+                self.close()
+
+        # The command uses its own default timing, which the defaults above
+        # match; its options differ between ydotool versions
+        subprocess.run(['ydotool', 'type', text], check=True)
+
+    def close(self):
+        """Close the socket connection"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    @staticmethod
+    def _encode(text: str) -> List[Tuple[List[bytes], List[bytes]]]:
+        """Encode text as (press, release) event packets per key
+
+        Every key event is followed by a sync; shifted characters hold
+        shift around the key.
+        """
+        sync = _INPUT_EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0)
+
+        def event(code: int, value: int) -> List[bytes]:
+            return [_INPUT_EVENT.pack(0, 0, EV_KEY, code, value), sync]
+
+        keys = []
+        for char in text:
+            key = _KEYMAP.get(char)
+            if key is None:
+                # Same as `ydotool type`: characters without a key are skipped
+                continue
+            code, shift = key
+            if shift:
+                keys.append((event(KEY_LEFTSHIFT, 1) + event(code, 1),
+                             event(code, 0) + event(KEY_LEFTSHIFT, 0)))
+            else:
+                keys.append((event(code, 1), event(code, 0)))
+        return keys
@@ -1,5 +1,4 @@
 import tkinter as tk
-from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +11,9 @@ class PredictionOverlay:
         self.root = tk.Tk()
         self._setup_window()
         self.label = None
+        self._text_var = tk.StringVar(self.root, value='')
+        self._last_xy = None
+        self.visible = False
 
     def _setup_window(self):
         try:
@@ -20,42 +22,51 @@ class PredictionOverlay:
             self.root.config(bg='black')
             self.root.overrideredirect(True)
             self.root.withdraw()
-        except Exception as e:
-            logger.error(f"Error setting up overlay window: {e}")
+        except tk.TclError as e:
+            logger.error("Error setting up overlay window: %s", e)
 
     def show(self, text: str, x: int, y: int):
         """Show prediction at specified coordinates"""
         try:
+            self._text_var.set(text)
             if not self.label:
                 self.label = tk.Label(
                     self.root,
-                    text=text,
+                    textvariable=self._text_var,
                     fg='white',
                     bg='black',
                     font=('Sans', 10)
                 )
                 self.label.pack()
-            else:
-                self.label.config(text=text)
 
-            self.root.geometry(f'+{x}+{y-30}')
-            self.root.deiconify()
-            self.root.update()
-        except Exception as e:
-            logger.error(f"Error showing overlay: {e}")
+            # Issue the window manager commands as a single Tcl script
+            # instead of one Tkinter wrapper call each; the window keeps
+            # its position while hidden, so unchanged geometry is skipped
+            window = str(self.root)
+            script = f'wm deiconify {window}'
+            if (x, y) != self._last_xy:
+                script = f'wm geometry {window} +{x}+{y-30}; {script}'
+                self._last_xy = (x, y)
+            self.root.tk.eval(script)
+            self.visible = True
+            # Redraw without draining the whole Tk event queue
+            self.root.update_idletasks()
+        except tk.TclError as e:
+            logger.error("Error showing overlay: %s", e)
 
     def hide(self):
         """Hide the overlay"""
         try:
             self.root.withdraw()
-            self.root.update()
-        except Exception as e:
-            logger.error(f"Error hiding overlay: {e}")
+            self.visible = False
+            self.root.update_idletasks()
+        except tk.TclError as e:
+            logger.error("Error hiding overlay: %s", e)
 
     def update(self):
         """Update the overlay window"""
         try:
             self.root.update()
-        except Exception as e:
-            logger.error(f"Error updating overlay: {e}")
+        except tk.TclError as e:
+            logger.error("Error updating overlay: %s", e)
         return True